@@ -3,265 +3,486 @@
 SkewKiller - Sync system time with NTP server, execute command, restore time
 """
 import socket
+import select
 import struct
 import time
 import subprocess
 import sys
 import os
-import ctypes
-import ctypes.util
-import argparse
+import shlex
 import signal
+import logging
 from datetime import datetime
 from typing import Optional
 
+log = logging.getLogger('skewkiller')
+
+
+class _TS:
+    """Lazy log argument: renders nanoseconds as a datetime only if the
+    record is actually emitted"""
+    __slots__ = ('ns',)
+
+    def __init__(self, ns):
+        self.ns = ns
+
+    def __str__(self):
+        return str(datetime.fromtimestamp(self.ns / 1e9))
+
+# The effective UID cannot change underneath us; check it once
+_IS_ROOT = os.geteuid() == 0
+# Prebuilt 48-byte client request: NTP version 3, mode 3 (client)
+_NTP_REQ = bytes([0x1B]) + bytes(47)
+# Requests sent per sync; the minimum-delay reply wins
+_NTP_SAMPLES = 4
+# Elapsed-time clock immune to both settimeofday steps and NTP slew
+_MONO_RAW = getattr(time, 'CLOCK_MONOTONIC_RAW', time.CLOCK_MONOTONIC)
+# Kernel receive timestamping: not exposed by every Python build, 35 on Linux
+_SO_TIMESTAMPNS = getattr(socket, 'SO_TIMESTAMPNS', 35)
+# struct timespec as delivered in the SCM_TIMESTAMPNS control message
+_TIMESPEC = struct.Struct('ll')
+
+# adjtimex mode bits (linux/timex.h)
+_ADJ_SETOFFSET = 0x0100
+_ADJ_NANO = 0x2000
+
+# Lazily resolved adjtime(3) binding, shared by slew and counter-slew calls
+_ADJTIME = None
+# Lazily resolved adjtimex(2) binding for atomic delta steps
+_ADJTIMEX = None
+
+
+def _resolve_adjtime():
+    """Resolve and prototype adjtime(3) once
+
+    The function pointer, argtypes/restype declarations, the timeval
+    instances (delta in, olddelta out), and their byref wrappers are all
+    built on first use and then reused, so repeat calls skip the CDLL
+    attribute lookup, the prototype reflection, and the per-call
+    Structure/CArgObject allocations.
+    """
+    global _ADJTIME
+    if _ADJTIME is None:
+        import ctypes
+
+        class _TimeVal(ctypes.Structure):
+            _fields_ = [('tv_sec', ctypes.c_long),
+                        ('tv_usec', ctypes.c_long)]
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        fn = libc.adjtime
+        fn.argtypes = [ctypes.POINTER(_TimeVal), ctypes.POINTER(_TimeVal)]
+        fn.restype = ctypes.c_int
+        delta = _TimeVal()
+        old = _TimeVal()
+        _ADJTIME = (fn, delta, ctypes.byref(delta),
+                    old, ctypes.byref(old), ctypes.get_errno)
+    return _ADJTIME
+
+
+def _resolve_adjtimex():
+    """Resolve and prototype adjtimex(2) once, like _resolve_adjtime
+
+    Returns the cached function pointer, a preallocated struct timex, its
+    byref wrapper, and get_errno.
+    """
+    global _ADJTIMEX
+    if _ADJTIMEX is None:
+        import ctypes
+
+        class _TimeVal(ctypes.Structure):
+            _fields_ = [('tv_sec', ctypes.c_long),
+                        ('tv_usec', ctypes.c_long)]
+
+        class _Timex(ctypes.Structure):
+            _fields_ = [('modes', ctypes.c_uint),
+                        ('offset', ctypes.c_long),
+                        ('freq', ctypes.c_long),
+                        ('maxerror', ctypes.c_long),
+                        ('esterror', ctypes.c_long),
+                        ('status', ctypes.c_int),
+                        ('constant', ctypes.c_long),
+                        ('precision', ctypes.c_long),
+                        ('tolerance', ctypes.c_long),
+                        ('time', _TimeVal),
+                        ('tick', ctypes.c_long),
+                        ('ppsfreq', ctypes.c_long),
+                        ('jitter', ctypes.c_long),
+                        ('shift', ctypes.c_int),
+                        ('stabil', ctypes.c_long),
+                        ('jitcnt', ctypes.c_long),
+                        ('calcnt', ctypes.c_long),
+                        ('errcnt', ctypes.c_long),
+                        ('stbcnt', ctypes.c_long),
+                        ('tai', ctypes.c_int),
+                        ('_pad', ctypes.c_int * 11)]
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        fn = libc.adjtimex
+        fn.argtypes = [ctypes.POINTER(_Timex)]
+        fn.restype = ctypes.c_int
+        tx = _Timex()
+        _ADJTIMEX = (fn, tx, ctypes.byref(tx), ctypes.get_errno)
+    return _ADJTIMEX
+
 
 class CustomTimeManager:
     """Manages system time synchronization with NTP servers"""
     
-    def __init__(self, server_ip: str, verbose: bool = False):
+    def __init__(self, server_ip: str):
         self.server_ip = server_ip
-        self.verbose = verbose
-        self.original_time = None
+        self.original_time_ns = None
+        self._mono_start_ns = None
         self.original_timezone_offset = None
-        self.is_root = os.geteuid() == 0
-        
-        # Initialize libc for system calls
-        try:
-            libc_name = ctypes.util.find_library('c')
-            self.libc = ctypes.CDLL(libc_name or 'libc.so.6')
-        except Exception as e:
-            self.log(f"Failed to load libc: {e}")
-            self.libc = None
-
-        # Define time structures
-        class TimeSpec(ctypes.Structure):
-            _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
-
-        class TimeVal(ctypes.Structure):
-            _fields_ = [('tv_sec', ctypes.c_long), ('tv_usec', ctypes.c_long)]
+        self._applied_skew_ns = 0
+        self._sync_mode = None
 
-        self.TimeSpec = TimeSpec
-        self.TimeVal = TimeVal
+        # Persistent NTP socket, reused across the sync and any retries.
+        # CLOEXEC keeps the fd out of the executed command and NONBLOCK at
+        # creation saves the separate fcntl that setblocking would issue
+        cloexec = getattr(socket, 'SOCK_CLOEXEC', 0)
+        nonblock = getattr(socket, 'SOCK_NONBLOCK', 0)
+        self._ntp_sock = socket.socket(socket.AF_INET,
+                                       socket.SOCK_DGRAM | cloexec | nonblock)
+        if not nonblock:
+            self._ntp_sock.setblocking(False)
+        # Generous receive buffer so a burst of replies is never dropped,
+        # and REUSEADDR so rapid re-invocations don't collide on the port
+        self._ntp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)
+        self._ntp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._ntp_connected = False
+        self._recv_buf = bytearray(48)
 
-    def log(self, message: str):
-        """Log message with timestamp if verbose mode is enabled"""
-        if self.verbose:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"[{timestamp}] {message}")
+        # Ask the kernel to stamp each received packet at IRQ time; the
+        # stamp is immune to scheduling jitter between arrival and recvmsg
+        try:
+            self._ntp_sock.setsockopt(socket.SOL_SOCKET, _SO_TIMESTAMPNS, 1)
+            self._kernel_rx_ts = True
+        except OSError:
+            self._kernel_rx_ts = False
 
     def save_current_time(self) -> bool:
         """Save the current system time for later restoration"""
         try:
-            self.original_time = time.time()
+            self.original_time_ns = time.time_ns()
+            self._mono_start_ns = time.clock_gettime_ns(_MONO_RAW)
             self.original_timezone_offset = time.timezone
-            self.log(f"Saved original time: {datetime.fromtimestamp(self.original_time)}")
+            log.info("Saved original time: %s", _TS(self.original_time_ns))
             return True
         except Exception as e:
-            self.log(f"Failed to save current time: {e}")
-            return False
-
-    def validate_ip(self, ip: str) -> bool:
-        """Validate IP address format"""
-        try:
-            socket.inet_aton(ip)
-            return True
-        except socket.error:
+            log.info("Failed to save current time: %s", e)
             return False
 
-    def get_ntp_time(self) -> Optional[float]:
-        """Get time from NTP server"""
-        if not self.validate_ip(self.server_ip):
-            self.log(f"Invalid IP address: {self.server_ip}")
-            return None
-            
+    def get_ntp_time(self) -> Optional[int]:
+        """Get time from NTP server as Unix nanoseconds"""
         try:
-            self.log(f"Requesting time from NTP server: {self.server_ip}")
-            
-            # Create NTP packet
-            ntp_packet = bytearray(48)
-            ntp_packet[0] = 0x1B  # NTP version 3, mode 3 (client)
-            
-            # Create socket
-            client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            client.settimeout(10)
+            log.info("Requesting time from NTP server: %s", self.server_ip)
             
-            # Send request and measure time
-            send_time = time.time()
-            client.sendto(ntp_packet, (self.server_ip, 123))
-            
-            # Receive response
-            response, server_address = client.recvfrom(1024)
-            receive_time = time.time()
-            client.close()
-            
-            if len(response) < 48:
-                self.log("Invalid NTP response: packet too short")
+            # Resolve the server once (numeric addresses take getaddrinfo's
+            # fast path, hostnames cost one lookup total) and connect;
+            # send/recv on a connected UDP socket then skip both the
+            # per-packet address resolution and the destination lookup
+            client = self._ntp_sock
+            if not self._ntp_connected:
+                infos = socket.getaddrinfo(self.server_ip, 123,
+                                           socket.AF_INET, socket.SOCK_DGRAM)
+                client.connect(infos[0][4])
+                self._ntp_connected = True
+
+            # Fire a short burst of requests; bracket each exchange with the
+            # monotonic clock so the RTT estimates cannot be skewed by the
+            # wall clock we are about to change. Per-packet queuing jitter
+            # varies, so the reply with the smallest round trip carries the
+            # tightest offset estimate.
+            send_ns = []
+            for _ in range(_NTP_SAMPLES):
+                send_ns.append(time.perf_counter_ns())
+                client.send(_NTP_REQ)
+
+            # Collect replies on the non-blocking socket until the burst is
+            # answered or the deadline passes, receiving into the
+            # preallocated buffer and taking the kernel receive timestamp
+            # from the control message when enabled
+            response = self._recv_buf
+            best = None  # (delay_ns, server_ns)
+            got = 0
+            deadline = time.monotonic() + 10
+            while got < len(send_ns):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if best is not None:
+                    # Already have a usable sample; don't stall the sync
+                    # waiting out the full deadline for stragglers
+                    remaining = min(remaining, 0.2)
+                ready, _, _ = select.select([client], [], [], remaining)
+                if not ready:
+                    break
+                nbytes, ancdata, _flags, _addr = client.recvmsg_into(
+                    [response], socket.CMSG_SPACE(_TIMESPEC.size))
+                recv_ns = time.perf_counter_ns()
+
+                if self._kernel_rx_ts:
+                    for cmsg_level, cmsg_type, cmsg_data in ancdata:
+                        if (cmsg_level == socket.SOL_SOCKET
+                                and cmsg_type == _SO_TIMESTAMPNS
+                                and len(cmsg_data) >= _TIMESPEC.size):
+                            sec, nsec = _TIMESPEC.unpack_from(cmsg_data)
+                            # Shift our receive sample back by the time the
+                            # packet sat in the socket queue before recvmsg
+                            queue_ns = time.time_ns() - (sec * 1_000_000_000 + nsec)
+                            if 0 <= queue_ns < 1_000_000_000:
+                                recv_ns -= queue_ns
+                            break
+
+                # Replies from a connected socket arrive in send order; a
+                # dropped reply only inflates the next delay estimate, which
+                # the minimum-delay filter then discards
+                delay_ns = (recv_ns - send_ns[got]) // 2
+                got += 1
+
+                if nbytes < 48:
+                    log.info("Invalid NTP response: packet too short")
+                    continue
+
+                # Extract transmit timestamp (bytes 40-47) as one 64-bit
+                # read; int.from_bytes on a memoryview is a single C-level
+                # pass with no format dispatch, the split two integer ops
+                ntp64 = int.from_bytes(memoryview(response)[40:48], 'big')
+                ntp_seconds = ntp64 >> 32
+                ntp_fraction = ntp64 & 0xFFFFFFFF
+
+                # Convert NTP timestamp to Unix nanoseconds, all in exact
+                # integer arithmetic (no float hops until display time).
+                # NTP epoch starts 1900-01-01, Unix epoch 1970-01-01;
+                # the difference is 2208988800 seconds
+                sample_ns = (ntp_seconds - 2208988800) * 1_000_000_000
+                sample_ns += (ntp_fraction * 1_000_000_000) >> 32
+
+                # Adjust for network delay
+                sample_ns -= delay_ns
+
+                if best is None or delay_ns < best[0]:
+                    best = (delay_ns, sample_ns)
+
+            if best is None:
+                log.info("Timeout waiting for NTP server %s", self.server_ip)
                 return None
+
+            delay_ns, server_ns = best
+            log.info("Using best of %d NTP samples", got)
+
+            log.info("NTP server time: %s", _TS(server_ns))
+            log.info("Network delay: %.4f seconds", delay_ns / 1e9)
+
+            return server_ns
             
-            # Extract transmit timestamp (bytes 40-47)
-            transmit_timestamp = struct.unpack('!II', response[40:48])
-            ntp_seconds = transmit_timestamp[0]
-            ntp_fraction = transmit_timestamp[1]
-            
-            # Convert NTP timestamp to Unix timestamp
-            # NTP epoch starts at 1900-01-01, Unix epoch starts at 1970-01-01
-            # Difference is 2208988800 seconds
-            unix_timestamp = ntp_seconds - 2208988800
-            unix_timestamp += ntp_fraction / (2**32)
-            
-            # Adjust for network delay
-            network_delay = (receive_time - send_time) / 2
-            adjusted_timestamp = unix_timestamp - network_delay
-            
-            self.log(f"NTP server time: {datetime.fromtimestamp(adjusted_timestamp)}")
-            self.log(f"Network delay: {network_delay:.4f} seconds")
-            
-            return adjusted_timestamp
-            
-        except socket.timeout:
-            self.log(f"Timeout connecting to NTP server {self.server_ip}")
-            return None
         except socket.gaierror as e:
-            self.log(f"DNS resolution failed for {self.server_ip}: {e}")
+            log.info("DNS resolution failed for %s: %s", self.server_ip, e)
             return None
         except Exception as e:
-            self.log(f"Error getting NTP time: {e}")
+            log.info("Error getting NTP time: %s", e)
             return None
 
-    def set_system_time(self, timestamp: float) -> bool:
-        """Set system time using multiple methods"""
-        if not self.is_root:
-            self.log("Error: Root privileges required to set system time")
-            return False
+    def set_system_time(self, timestamp_ns: int) -> bool:
+        """Set system time from integer nanoseconds"""
+        log.info("Setting system time to: %s", _TS(timestamp_ns))
 
-        if not self.libc:
-            self.log("Error: libc not available for system calls")
-            return False
-
-        self.log(f"Setting system time to: {datetime.fromtimestamp(timestamp)}")
-        
-        # Method 1: Try settimeofday
+        # Prefer stepping by a delta via adjtimex(ADJ_SETOFFSET): the kernel
+        # applies the offset relative to its own current time, so scheduling
+        # delay between computing the target and entering the syscall does
+        # not leak into the resulting clock
         try:
-            tv = self.TimeVal()
-            tv.tv_sec = int(timestamp)
-            tv.tv_usec = int((timestamp - int(timestamp)) * 1_000_000)
-            
-            if self.libc.settimeofday(ctypes.byref(tv), None) == 0:
-                self.log("System time set successfully using settimeofday")
+            adjtimex, tx, tx_ref, get_errno = _resolve_adjtimex()
+            # Compute the offset at the last possible moment before the call
+            sec, rem_ns = divmod(timestamp_ns - time.time_ns(), 1_000_000_000)
+            tx.modes = _ADJ_SETOFFSET | _ADJ_NANO
+            tx.time.tv_sec = sec
+            tx.time.tv_usec = rem_ns  # nanoseconds under ADJ_NANO
+            if adjtimex(tx_ref) != -1:
+                log.info("System time set successfully using adjtimex")
                 return True
+            log.info("adjtimex failed: errno %d", get_errno())
         except Exception as e:
-            self.log(f"settimeofday failed: {e}")
+            log.info("adjtimex unavailable: %s", e)
 
-        # Method 2: Try clock_settime
+        # Fall back to setting the clock absolutely (thin libc wrapper,
+        # no fork, no float round-trip)
         try:
-            ts = self.TimeSpec()
-            ts.tv_sec = int(timestamp)
-            ts.tv_nsec = int((timestamp - int(timestamp)) * 1_000_000_000)
-            
-            if self.libc.clock_settime(0, ctypes.byref(ts)) == 0:
-                self.log("System time set successfully using clock_settime")
-                return True
-        except Exception as e:
-            self.log(f"clock_settime failed: {e}")
+            os.clock_settime_ns(time.CLOCK_REALTIME, timestamp_ns)
+            log.info("System time set successfully using clock_settime")
+            return True
+        except OSError as e:
+            log.info("clock_settime failed: %s", e)
+            return False
+
+    def _slew_time(self, delta_ns: int) -> bool:
+        """Smoothly slew the clock by delta_ns via adjtime(3)
 
-        # Method 3: Use date command as fallback
+        The kernel applies the correction gradually instead of stepping,
+        so timers and mtime comparisons on the box stay sane. ctypes is
+        imported lazily; adjtime has no stdlib binding.
+        """
         try:
-            date_str = datetime.fromtimestamp(timestamp).strftime("%m%d%H%M%Y.%S")
-            result = subprocess.run(['date', date_str], capture_output=True, text=True)
-            if result.returncode == 0:
-                self.log("System time set successfully using date command")
-                return True
-            else:
-                self.log(f"date command failed: {result.stderr}")
+            adjtime, delta, delta_ref, _old, _old_ref, get_errno = _resolve_adjtime()
+            # Floored divmod keeps tv_usec in [0, 1e6) for negative deltas
+            sec, rem_ns = divmod(delta_ns, 1_000_000_000)
+            delta.tv_sec = sec
+            delta.tv_usec = rem_ns // 1000
+            if adjtime(delta_ref, None) != 0:
+                log.info("adjtime failed: errno %d", get_errno())
+                return False
+            log.info("Slewing clock by %.4f seconds", delta_ns / 1e9)
+            return True
         except Exception as e:
-            self.log(f"date command failed: {e}")
+            log.info("adjtime unavailable: %s", e)
+            return False
 
-        self.log("All methods to set system time failed")
-        return False
+    def _pending_slew_ns(self) -> int:
+        """Read the not-yet-applied remainder of an adjtime slew
+
+        adjtime corrects at roughly 0.5 ms/s, so a slew routinely outlives
+        a short command; a NULL delta queries the outstanding correction
+        without disturbing it.
+        """
+        try:
+            adjtime, _delta, _delta_ref, old, old_ref, get_errno = _resolve_adjtime()
+            if adjtime(None, old_ref) != 0:
+                log.info("adjtime query failed: errno %d", get_errno())
+                return 0
+            return old.tv_sec * 1_000_000_000 + old.tv_usec * 1000
+        except Exception as e:
+            log.info("adjtime unavailable: %s", e)
+            return 0
 
     def sync_time_with_server(self) -> bool:
         """Synchronize system time with NTP server"""
-        if not self.is_root:
-            self.log("Error: Root privileges required for time synchronization")
+        server_ns = self.get_ntp_time()
+        if server_ns is None:
+            log.info("Failed to get time from NTP server")
             return False
-            
-        server_time = self.get_ntp_time()
-        if server_time is None:
-            self.log("Failed to get time from NTP server")
-            return False
-            
-        local_time = time.time()
-        time_diff = abs(server_time - local_time)
-        self.log(f"Time difference: {time_diff:.4f} seconds")
-        
-        if time_diff < 0.1:  # Less than 100ms difference
-            self.log("System time is already synchronized (difference < 100ms)")
+
+        diff_ns = server_ns - time.time_ns()
+        log.info("Time difference: %.4f seconds", diff_ns / 1e9)
+
+        if abs(diff_ns) < 100_000_000:  # Less than 100ms difference
+            log.info("System time is already synchronized (difference < 100ms)")
             return True
-            
-        return self.set_system_time(server_time)
+
+        if abs(diff_ns) < 128_000_000:  # Within the kernel's slew range
+            if self._slew_time(diff_ns):
+                self._applied_skew_ns = diff_ns
+                self._sync_mode = 'slew'
+                return True
+            # adjtime unavailable: fall through to a plain step
+
+        if self.set_system_time(server_ns):
+            self._applied_skew_ns = diff_ns
+            self._sync_mode = 'step'
+            return True
+        return False
 
     def restore_original_time(self) -> bool:
         """Restore the original system time"""
-        if self.original_time is None:
-            self.log("No original time saved")
+        if self.original_time_ns is None:
+            log.info("No original time saved")
             return False
-            
-        if not self.is_root:
-            self.log("Error: Root privileges required to restore time")
-            return False
-            
+
+        if abs(self._applied_skew_ns) < 50_000_000:  # Less than 50ms applied
+            log.info("Applied skew was negligible, skipping restore")
+            return True
+
+        if self._sync_mode == 'slew':
+            # The slew may still be in flight; the counter-slew replaces
+            # any pending remainder, so only reverse the portion the
+            # kernel has actually applied
+            remaining_ns = self._pending_slew_ns()
+            applied_ns = self._applied_skew_ns - remaining_ns
+            log.info("Reversing applied slew of %.4f seconds (%.4f still pending)",
+                     applied_ns / 1e9, remaining_ns / 1e9)
+            return self._slew_time(-applied_ns)
+
         try:
-            # Calculate how much time has elapsed since we saved the original time
-            current_execution_time = time.time()
-            execution_duration = current_execution_time - self.original_time
-            
-            # The restore time should be the original time plus the execution duration
-            # This accounts for the time that has actually passed
-            restore_time = self.original_time + execution_duration
-            
-            self.log(f"Restoring to original time + execution duration: {datetime.fromtimestamp(restore_time)}")
-            return self.set_system_time(restore_time)
+            # Measure the elapsed execution time on the raw monotonic clock;
+            # the wall clock was stepped by our own sync and cannot be trusted
+            elapsed_ns = time.clock_gettime_ns(_MONO_RAW) - self._mono_start_ns
+
+            # The restore time is the original time plus the execution
+            # duration, accounting for the time that has actually passed
+            restore_ns = self.original_time_ns + elapsed_ns
+
+            if abs(time.time_ns() - restore_ns) < 1_000_000:  # already within 1ms
+                log.info("Clock already within 1ms of restore target, skipping")
+                return True
+
+            log.info("Restoring to original time + execution duration: %s", _TS(restore_ns))
+            return self.set_system_time(restore_ns)
             
         except Exception as e:
-            self.log(f"Failed to restore original time: {e}")
+            log.info("Failed to restore original time: %s", e)
             return False
 
+    def close(self):
+        """Release the persistent NTP socket"""
+        self._ntp_sock.close()
+
+
+def _needs_shell(command: str) -> bool:
+    """Check whether a command relies on shell features (pipes, globs, etc.)"""
+    return any(c in command for c in '|&;<>$`*?')
+
 
-def execute_command(command: str, verbose: bool = False) -> bool:
+def execute_command(command: str) -> bool:
     """Execute shell command with real-time output"""
-    if verbose:
-        print(f"Executing command: {command}")
-    
+    log.info("Executing command: %s", command)
+
     try:
+        # Skip the /bin/sh intermediary unless the command actually needs it
+        use_shell = _needs_shell(command)
         process = subprocess.Popen(
-            command, 
-            shell=True, 
+            command if use_shell else shlex.split(command),
+            shell=use_shell,
+            stdin=subprocess.DEVNULL,
             stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT, 
-            text=True, 
-            bufsize=1,
-            universal_newlines=True
+            stderr=subprocess.STDOUT,
+            bufsize=0
         )
-        
-        # Read output line by line
+
+        # Pump output in large binary chunks: one read syscall covers many
+        # lines, and os.write to fd 1 skips Python's buffered writer (and
+        # its lock/flush) entirely — bytes go kernel to kernel
+        sys.stdout.flush()
+        fd = process.stdout.fileno()
         while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
+            ready, _, _ = select.select([process.stdout], [], [], 0.1)
+            if ready:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    # EOF: the write end is closed, nothing more can arrive
+                    break
+                os.write(1, chunk)
+                continue
+            if process.poll() is not None:
+                # The child exited between the select timeout and the poll;
+                # drain anything it wrote in that window before stopping
+                while True:
+                    ready, _, _ = select.select([process.stdout], [], [], 0)
+                    if not ready:
+                        break
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        break
+                    os.write(1, chunk)
                 break
-            if output:
-                print(output.strip())
-        
+
         return_code = process.wait()
-        
-        if verbose:
-            print(f"Command completed with return code: {return_code}")
-            
+
+        log.info("Command completed with return code: %s", return_code)
+
         return return_code == 0
-        
+
     except KeyboardInterrupt:
-        if verbose:
-            print("Command interrupted by user")
+        log.info("Command interrupted by user")
         process.terminate()
         return False
     except Exception as e:
@@ -275,14 +496,12 @@ def signal_handler(signum, frame):
     sys.exit(1)
 
 
-def main():
-    """Main function"""
-    # Set up signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
-    # Parse command line arguments
+def _print_help():
+    """Print full usage; argparse is imported lazily so only --help pays
+    for its import chain"""
+    import argparse
     parser = argparse.ArgumentParser(
+        prog='skewkiller',
         description="SkewKiller - Synchronize system time with NTP server, execute command, then restore time",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
@@ -292,34 +511,73 @@ Examples:
   sudo ./skewkiller --verbose pool.ntp.org "make test"
         """
     )
-    
     parser.add_argument('server_ip', help='NTP server IP address or hostname')
     parser.add_argument('command', help='Command to execute after time sync')
-    parser.add_argument('-v', '--verbose', action='store_true', 
-                       help='Enable verbose logging')
-    
-    args = parser.parse_args()
-    
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Enable verbose logging')
+    parser.print_help()
+
+
+def parse_args(argv):
+    """Parse the small fixed CLI by hand; importing argparse costs several
+    milliseconds of startup that short-lived invocations notice"""
+    verbose = False
+    positionals = []
+    for arg in argv:
+        if arg in ('-v', '--verbose'):
+            verbose = True
+        elif arg in ('-h', '--help'):
+            _print_help()
+            sys.exit(0)
+        elif arg.startswith('-') and len(arg) > 1:
+            print(f"Error: Unknown option: {arg}")
+            sys.exit(2)
+        else:
+            positionals.append(arg)
+
+    if len(positionals) < 2:
+        print("usage: skewkiller [-h] [-v] server_ip command")
+        sys.exit(2)
+
+    server_ip = positionals[0]
+    # Accept an unquoted command tail for convenience
+    command = positionals[1] if len(positionals) == 2 else ' '.join(positionals[1:])
+    return server_ip, command, verbose
+
+
+def main():
+    """Main function"""
+    # Set up signal handlers
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    # Parse command line arguments
+    server_ip, command, verbose = parse_args(sys.argv[1:])
+
+    logging.basicConfig(format='[%(asctime)s] %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=logging.INFO if verbose else logging.WARNING)
+
     # Check root privileges
-    if os.geteuid() != 0:
+    if not _IS_ROOT:
         print("Error: SkewKiller requires root privileges to modify system time.")
         print("Please run with sudo: sudo ./skewkiller ...")
         sys.exit(1)
-    
+
     # Validate inputs
-    if not args.server_ip.strip():
+    if not server_ip.strip():
         print("Error: Server IP cannot be empty")
         sys.exit(1)
-        
-    if not args.command.strip():
+
+    if not command.strip():
         print("Error: Command cannot be empty")
         sys.exit(1)
-    
+
     # Create time manager
-    time_manager = CustomTimeManager(args.server_ip, args.verbose)
-    
+    time_manager = CustomTimeManager(server_ip)
+
     try:
-        print(f"SkewKiller: Starting time synchronization with {args.server_ip}...")
+        print(f"SkewKiller: Starting time synchronization with {server_ip}...")
         
         # Save current time
         if not time_manager.save_current_time():
@@ -334,7 +592,7 @@ Examples:
         print("Time synchronized successfully. Executing command...")
         
         # Execute the command
-        success = execute_command(args.command, args.verbose)
+        success = execute_command(command)
         
         if success:
             print("Command executed successfully.")
@@ -352,6 +610,7 @@ Examples:
             print("Original time restored successfully.")
         else:
             print("Warning: Failed to restore original system time.")
+        time_manager.close()
     
     print("SkewKiller operation completed.")
 